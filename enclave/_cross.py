@@ -2,14 +2,15 @@
 cross contains the Cross specific API and calls an instance of BaseClient to make requests and handle auth.
 """
 
-import json
 import re
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Dict, Final, Optional
 
 from . import _baseclient
 from .models import Res
 
+_PAIR_SEPARATORS: Final = re.compile(r"[-/_]")
+
 
 class Cross:
     """Cross contains the Cross specific API and calls an instance of BaseClient to make requests and handle auth.
@@ -50,20 +51,24 @@ class Cross:
         - customer_order_id: an order ID that the customer can pass in for their own reference (e.g. "abc123"). Optional.
         - expiration_unix_secs: when the placed order will expire and be automatically cancelled, in seconds from the unix epoch. Must be less than a year in the future. A value of 0 is ignored. Optional.
         """
-        base, quote = re.split(r"[-/_]", pair)
-        body = {
+        base, quote = _PAIR_SEPARATORS.split(pair)
+        body: Dict[str, Any] = {
             "orderCategory": "CN",
             "pair": {"base": base, "quote": quote},
             "side": side,
             "size": str(size),
-            "cancelAbove": str(cancel_above) if cancel_above else None,
-            "cancelBelow": str(cancel_below) if cancel_below else None,
-            "customerOrderId": customer_order_id,
-            "expirationUnix": expiration_unix_secs,
         }
-        body_filtered = {k: v for k, v in body.items() if v is not None}  # filter None
-
-        return self.bc.post("/v0/add_order", body=json.dumps(body_filtered))
+        # only set the optional fields that were given
+        if cancel_above:
+            body["cancelAbove"] = str(cancel_above)
+        if cancel_below:
+            body["cancelBelow"] = str(cancel_below)
+        if customer_order_id is not None:
+            body["customerOrderId"] = customer_order_id
+        if expiration_unix_secs is not None:
+            body["expirationUnix"] = expiration_unix_secs
+
+        return self.bc.post("/v0/add_order", body=_baseclient.dumps(body))
 
     def cancel_order(self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None) -> Res:
         """Cancels an order by either the internal order ID or the customer order ID. Exactly one of these must be provided.
@@ -82,7 +87,7 @@ class Cross:
         else:
             raise ValueError("Must provide exactly one of customer_order_id or internal_order_id")
 
-        return self.bc.post("/v0/cancel_order", body=json.dumps(body))
+        return self.bc.post("/v0/cancel_order", body=_baseclient.dumps(body))
 
     def get_order_status(
         self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None
@@ -104,19 +109,19 @@ class Cross:
         else:
             raise ValueError("Must provide exactly one of customer_order_id or internal_order_id")
 
-        return self.bc.post("/v0/get_order_status", body=json.dumps(body))
+        return self.bc.post("/v0/get_order_status", body=_baseclient.dumps(body))
 
     def get_open_orders(self) -> Res:
         """Returns all open orders for an account
 
         `GET /v0/orders`"""
-        return self.bc.get("/v0/orders")
+        return self.bc.get("/v0/orders", fixed_path=True)
 
     def get_order_history(self) -> Res:
         """Returns all orders for an account
 
         `GET /v0/orders/history`"""
-        return self.bc.get("/v0/orders/history")
+        return self.bc.get("/v0/orders/history", fixed_path=True)
 
     def get_order(self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None) -> Res:
         """Returns the order with the provided ID
@@ -125,12 +130,11 @@ class Cross:
         or
         `GET /v0/orders/client:{customer_order_id}` if customer_order_id."""
 
-        if (not any((customer_order_id, internal_order_id))) or all((customer_order_id, internal_order_id)):
-            raise ValueError("Must provide exactly one of customer_order_id or internal_order_id")
+        _baseclient.require_one(customer_order_id, internal_order_id, "customer_order_id", "internal_order_id")
 
-        path = f"client:{customer_order_id}" if customer_order_id else internal_order_id
+        path = f"/v0/orders/client:{customer_order_id}" if customer_order_id else f"/v0/orders/{internal_order_id}"
 
-        return self.bc.get(f"/v0/orders/{path}")
+        return self.bc.get(path)
 
     def get_fills_by_id(
         self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None
@@ -143,12 +147,15 @@ class Cross:
         or
         `GET /v0/orders/client:{customer_order_id}/fills` if customer_order_id."""
 
-        if (not any((customer_order_id, internal_order_id))) or all((customer_order_id, internal_order_id)):
-            raise ValueError("Must provide exactly one of customer_order_id or internal_order_id")
+        _baseclient.require_one(customer_order_id, internal_order_id, "customer_order_id", "internal_order_id")
 
-        path = f"client:{customer_order_id}" if customer_order_id else internal_order_id
+        path = (
+            f"/v0/orders/client:{customer_order_id}/fills"
+            if customer_order_id
+            else f"/v0/orders/{internal_order_id}/fills"
+        )
 
-        return self.bc.get(f"/v0/orders/{path}/fills")
+        return self.bc.get(path)
 
     def get_fills(
         self,
@@ -169,12 +176,7 @@ class Cross:
         - cursor: pagination cursor (e.g. NQ5WWO3THN3Q====). Optional.
         """
 
-        query = {
-            "limit": limit,
-            "startTime": start_ms,
-            "endTime": end_ms,
-            "cursor": cursor,
-        }
+        query = _baseclient.filter_none(limit=limit, startTime=start_ms, endTime=end_ms, cursor=cursor)
 
         return self.bc.get("/v0/fills", params=query)
 
@@ -194,7 +196,7 @@ class Cross:
         if end_secs is not None:
             body["end_time"] = end_secs
 
-        return self.bc.post("/v0/fills/csv", body=json.dumps(body))
+        return self.bc.post("/v0/fills/csv", body=_baseclient.dumps(body))
 
     def get_price(self, pair: str) -> Res:
         """Gets the price of a specific trading pair
@@ -204,15 +206,138 @@ class Cross:
         Request body parameters:
         - pair: the currency pair to trade (e.g. AVAX-ETH, separator can be /,_,-).
         """
-        base, quote = re.split(r"[-/_]", pair)
+        base, quote = _PAIR_SEPARATORS.split(pair)
         body = {
             "pair": {"base": base, "quote": quote},
         }
 
-        return self.bc.post("/v0/price", body=json.dumps(body))
+        return self.bc.post("/v0/price", body=_baseclient.dumps(body))
 
     def get_prices(self) -> Res:
         """Gets the prices of all trading pairs
 
         `GET /v0/prices`"""
-        return self.bc.get("/v0/prices")
+        return self.bc.get("/v0/prices", fixed_path=True)
+
+
+class AsyncCross:
+    """AsyncCross is the async version of Cross.
+    Each method makes the same request as its Cross counterpart on the AsyncBaseClient's thread pool,
+    so independent requests can run concurrently, e.g. `await asyncio.gather(cross.get_prices(), cross.get_fills())`.
+
+    Designed to be used as `AsyncClient(...).cross.a_cross_endpoint(...)` and not initialized directly.
+
+    See `Cross` for the documentation of each endpoint.
+    """
+
+    def __init__(self, base_client: _baseclient.AsyncBaseClient):
+        self.bc = base_client
+        self._cross = Cross(base_client.bc)
+
+    async def add_order(
+        self,
+        pair: str,
+        side: str,
+        size: Decimal,
+        *,
+        cancel_above: Optional[Decimal] = None,
+        cancel_below: Optional[Decimal] = None,
+        customer_order_id: Optional[str] = None,
+        expiration_unix_secs: Optional[int] = None,
+    ) -> Res:
+        """Adds an order to the crossing network, see `Cross.add_order`.
+
+        `POST /v0/add_order`"""
+        return await self.bc.run(
+            self._cross.add_order,
+            pair,
+            side,
+            size,
+            cancel_above=cancel_above,
+            cancel_below=cancel_below,
+            customer_order_id=customer_order_id,
+            expiration_unix_secs=expiration_unix_secs,
+        )
+
+    async def cancel_order(
+        self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None
+    ) -> Res:
+        """Cancels an order by either the internal order ID or the customer order ID, see `Cross.cancel_order`.
+
+        `POST /v0/cancel_order`"""
+        return await self.bc.run(
+            self._cross.cancel_order, internal_order_id=internal_order_id, customer_order_id=customer_order_id
+        )
+
+    async def get_order_status(
+        self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None
+    ) -> Res:
+        """Gets the status of a placed order, see `Cross.get_order_status`.
+
+        `POST /v0/get_order_status`"""
+        return await self.bc.run(
+            self._cross.get_order_status, internal_order_id=internal_order_id, customer_order_id=customer_order_id
+        )
+
+    async def get_open_orders(self) -> Res:
+        """Returns all open orders for an account
+
+        `GET /v0/orders`"""
+        return await self.bc.run(self._cross.get_open_orders)
+
+    async def get_order_history(self) -> Res:
+        """Returns all orders for an account
+
+        `GET /v0/orders/history`"""
+        return await self.bc.run(self._cross.get_order_history)
+
+    async def get_order(
+        self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None
+    ) -> Res:
+        """Returns the order with the provided ID, see `Cross.get_order`.
+
+        `GET /v0/orders/{internal_order_id}` or `GET /v0/orders/client:{customer_order_id}`"""
+        return await self.bc.run(
+            self._cross.get_order, internal_order_id=internal_order_id, customer_order_id=customer_order_id
+        )
+
+    async def get_fills_by_id(
+        self, *, internal_order_id: Optional[str] = None, customer_order_id: Optional[str] = None
+    ) -> Res:
+        """Returns the fills associated with the order with the provided ID, see `Cross.get_fills_by_id`.
+
+        `GET /v0/orders/{internal_order_id}/fills` or `GET /v0/orders/client:{customer_order_id}/fills`"""
+        return await self.bc.run(
+            self._cross.get_fills_by_id, internal_order_id=internal_order_id, customer_order_id=customer_order_id
+        )
+
+    async def get_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Res:
+        """Returns all fills for an account, see `Cross.get_fills`.
+
+        `GET /v0/fills`"""
+        return await self.bc.run(self._cross.get_fills, limit=limit, start_ms=start_ms, end_ms=end_ms, cursor=cursor)
+
+    async def get_fills_csv(self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None) -> Res:
+        """Gets CSV formatted fills for an account within the start and end times, see `Cross.get_fills_csv`.
+
+        `POST /v0/fills/csv`"""
+        return await self.bc.run(self._cross.get_fills_csv, start_secs=start_secs, end_secs=end_secs)
+
+    async def get_price(self, pair: str) -> Res:
+        """Gets the price of a specific trading pair, see `Cross.get_price`.
+
+        `POST /v0/price`"""
+        return await self.bc.run(self._cross.get_price, pair)
+
+    async def get_prices(self) -> Res:
+        """Gets the prices of all trading pairs
+
+        `GET /v0/prices`"""
+        return await self.bc.run(self._cross.get_prices)
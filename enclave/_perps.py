@@ -1,9 +1,11 @@
 """
 Perps contains the Perps specific API and calls an instance of BaseClient to make requests and handle auth.
 """
-import json
+
+import asyncio
+from concurrent.futures import Future
 from decimal import Decimal
-from typing import Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
 from . import _baseclient, models
 from .models import Res
@@ -34,7 +36,7 @@ class Perps:
 
         `GET /v1/perps/positions`"""
 
-        return self.bc.get("/v1/perps/positions")
+        return self.bc.get("/v1/perps/positions", fixed_path=True)
 
     def transfer(self, symbol: str, amount: Union[Decimal, str]) -> Res:
         """Make a transfer between your main wallet and margin account.
@@ -47,38 +49,25 @@ class Perps:
         - symbol: currency symbol (e.g. AVAX).
         - amount: amount to transfer (e.g. 100.0)."""
 
-        if Decimal(amount) < Decimal(0):
-            body = {
-                "symbol": symbol,
-                "amount": str(Decimal(amount).copy_abs()), 
-                "from": {
-                    "wallet": "margin"
-                },
-                "to": {
-                    "wallet": "main"
-                }
-            }
-        else:
-            body = {
-                "symbol": symbol,
-                "amount": str(amount), 
-                "from": {
-                    "wallet": "main"
-                },
-                "to": {
-                    "wallet": "margin"
-                }
-            }
-        return self.bc.post("/v1/perps/transfers", body=json.dumps(body))
+        dec = amount if isinstance(amount, Decimal) else Decimal(amount)  # parse once
+        withdraw = dec.is_signed()
+        src, dst = ("margin", "main") if withdraw else ("main", "margin")
+        body = {
+            "symbol": symbol,
+            "amount": str(dec.copy_abs()),
+            "from": {"wallet": src},
+            "to": {"wallet": dst},
+        }
+        return self.bc.post("/v1/perps/transfers", body=_baseclient.dumps(body))
 
     def get_balance(self) -> Res:
         """Get a summary of the balance for a margin account, with a high-level breakdown.
 
         `GET /v1/perps/balance`"""
 
-        return self.bc.get("/v1/perps/balance")
+        return self.bc.get("/v1/perps/balance", fixed_path=True)
 
-    def get_funding_rates(self, market: str) -> Res:
+    def get_funding_rates(self, market: str, *, max_age_secs: float = 0) -> Res:
         """Get an estimate of the current-interval funding rate in a given market,
         as well as when the next funding is
         and what premium index measurements make up the funding rate.
@@ -86,9 +75,13 @@ class Perps:
         `GET /v1/perps/funding_rates`
 
         Request Query Parameters:
-        - market: trading market (e.g. BTC-USD.P)."""
+        - market: trading market (e.g. BTC-USD.P).
+
+        Repeated calls are revalidated with the previous response's ETag, and reuse it if not modified.
+        `max_age_secs` reuses the previous response without a request while it is younger than that (e.g. 30).
+        The estimate changes during the interval, so this is off by default."""
         query = {"market": market}
-        return self.bc.get("/v1/perps/funding_rates", params=query)
+        return self.bc.get("/v1/perps/funding_rates", params=query, conditional=True, max_age_secs=max_age_secs)
 
     def get_funding_rate_history(
         self,
@@ -110,15 +103,26 @@ class Perps:
         - start_ms: Beginning time to filter (UTC milliseconds) (e.g. 1684814400000). Optional.
         - end_ms: Ending time to filter (UTC milliseconds) (e.g. 1672549200000). Optional."""
 
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "market": market,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
+        query = _baseclient.filter_none(limit=limit, cursor=cursor, market=market, startTime=start_ms, endTime=end_ms)
         return self.bc.get("/v1/perps/funding_rate_history", params=query)
 
+    def iter_funding_rate_history(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over the historical funding rates, following the pagination cursor across pages.
+        Takes the same parameters as `get_funding_rate_history` (`limit` sets the page size).
+
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(
+            self.get_funding_rate_history, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms
+        )
+
     def get_funding_fees(
         self,
         *,
@@ -139,15 +143,24 @@ class Perps:
         - start_ms: Beginning time to filter (UTC milliseconds) (e.g. 1684814400000). Optional.
         - end_ms: Ending time to filter (UTC milliseconds) (e.g. 1672549200000). Optional."""
 
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "market": market,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
+        query = _baseclient.filter_none(limit=limit, cursor=cursor, market=market, startTime=start_ms, endTime=end_ms)
         return self.bc.get("/v1/perps/funding_fees", params=query)
 
+    def iter_funding_fees(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over the historical funding fee payments, following the pagination cursor across pages.
+        Takes the same parameters as `get_funding_fees` (`limit` sets the page size).
+
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(self.get_funding_fees, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms)
+
     def get_transfers(
         self,
         *,
@@ -166,20 +179,29 @@ class Perps:
         - start_ms: start time to filter (UTC milliseconds) (e.g. 1684814400). Optional.
         - end_ms: end time to filter(UTC milliseconds) (e.g. 1672549200). Optional."""
 
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
+        query = _baseclient.filter_none(limit=limit, cursor=cursor, startTime=start_ms, endTime=end_ms)
         return self.bc.get("/v1/perps/transfers", params=query)
 
+    def iter_transfers(
+        self,
+        *,
+        limit: Optional[int] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over all margin account transfers, following the pagination cursor across pages.
+        Takes the same parameters as `get_transfers` (`limit` sets the page size).
+
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(self.get_transfers, limit=limit, start_ms=start_ms, end_ms=end_ms)
+
     def get_stop_orders(self) -> Res:
         """Gets list of all stop orders for all markets
 
         `GET /v1/perps/stop_order`"""
 
-        return self.bc.get("/v1/perps/stop_order")
+        return self.bc.get("/v1/perps/stop_order", fixed_path=True)
 
     def set_stop_order(
         self,
@@ -202,10 +224,10 @@ class Perps:
 
         if position_direction not in models.DIRECTIONS:
             raise ValueError(
-                f"Unsupported position_direction {position_direction=}. Must be one of {models.DIRECTIONS}."
+                f"Unsupported position_direction {position_direction=}. Must be one of {sorted(models.DIRECTIONS)}."
             )
         if order_type not in models.STOP_TYPES:
-            raise ValueError(f"Unsupported order_type {order_type=}. Must be one of {models.STOP_TYPES}.")
+            raise ValueError(f"Unsupported order_type {order_type=}. Must be one of {sorted(models.STOP_TYPES)}.")
 
         body = {
             "market": market,
@@ -213,7 +235,7 @@ class Perps:
             "type": order_type,
             "triggerPrice": str(trigger_price),
         }
-        return self.bc.post("/v1/perps/stop_order", body=json.dumps(body))
+        return self.bc.post("/v1/perps/stop_order", body=_baseclient.dumps(body))
 
     def remove_stop_order(self, market: str, *, order_type: Optional[str] = None) -> Res:
         """Remove a stop order for a particular position defined by market and direction.
@@ -226,7 +248,7 @@ class Perps:
         - market: Perps market (e.g. BTC-USD.P).
         - type: stopLoss | takeProfit (e.g. "stopLoss"). Optional."""
 
-        query = {"market": market, "type": order_type}
+        query = _baseclient.filter_none(market=market, type=order_type)
         return self.bc.delete("/v1/perps/stop_order", params=query)
 
     ### Shared API with Spot
@@ -240,6 +262,7 @@ class Perps:
         status: Optional[str] = None,
         start_ms: Optional[int] = None,
         end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
     ) -> Res:
         """
         Get orders that meet the optional parameters.
@@ -253,17 +276,34 @@ class Perps:
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - status: The status to filter orders by (e.g. open). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
 
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "market": market,
-            "status": status,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/perps/orders", params=query)
+        `max_age_secs` reuses the previous response for the same parameters without a request
+        while it is younger than that (e.g. 0.25). Off by default.
+        Placing or cancelling orders through this client forgets the kept order and fill responses."""
+
+        query = _baseclient.filter_none(
+            limit=limit, cursor=cursor, market=market, status=status, startTime=start_ms, endTime=end_ms
+        )
+        return self.bc.get("/v1/perps/orders", params=query, max_age_secs=max_age_secs)
+
+    def iter_orders(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over all orders that meet the optional parameters, following the pagination cursor across pages.
+        Takes the same parameters as `get_orders` (`limit` sets the page size).
+
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(
+            self.get_orders, limit=limit, market=market, status=status, start_ms=start_ms, end_ms=end_ms
+        )
 
     def get_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
         """
@@ -278,12 +318,11 @@ class Perps:
         - client_order_id: The client order ID to retrieve (e.g. abc123). Optional.
         - order_id: The internal order ID to retrieve (e.g. 197ec08e001658690721be129e7fa595). Optional."""
 
-        if (not any((client_order_id, order_id))) or all((client_order_id, order_id)):
-            raise ValueError("Must provide exactly one of client_order_id or order_id")
+        _baseclient.require_one(client_order_id, order_id, "client_order_id", "order_id")
 
-        path = f"client:{client_order_id}" if client_order_id else str(order_id)
+        path = f"/v1/perps/orders/client:{client_order_id}" if client_order_id else f"/v1/perps/orders/{order_id}"
 
-        return self.bc.get(f"/v1/perps/orders/{path}")
+        return self.bc.get(path)
 
     def get_orders_csv(
         self,
@@ -292,6 +331,7 @@ class Perps:
         status: Optional[str] = None,
         start_ms: Optional[int] = None,
         end_ms: Optional[int] = None,
+        stream: bool = False,
     ) -> Res:
         """
         Export CSV of orders that meet the optional parameters.
@@ -302,17 +342,30 @@ class Perps:
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - status: The status to filter orders by (e.g. open). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
 
-        query = {
-            "market": market,
-            "status": status,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/perps/orders/csv", params=query)
+        `stream` returns before the CSV is downloaded, to be read line by line with `Response.iter_lines()`
+        instead of being held in memory at once. Close the response if it is not read to the end."""
 
-    def get_depth(self, market: str, *, depth: Optional[int] = None) -> Res:
+        query = _baseclient.filter_none(market=market, status=status, startTime=start_ms, endTime=end_ms)
+        return self.bc.get("/v1/perps/orders/csv", params=query, stream=stream)
+
+    def iter_orders_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[List[str]]:
+        """Iterate over the rows of the CSV export of orders (header first) as it downloads,
+        without holding the whole export in memory. Takes the same parameters as `get_orders_csv`.
+
+        Raises `requests.HTTPError` if the request fails."""
+
+        return _baseclient.read_csv(self.get_orders_csv, market=market, status=status, start_ms=start_ms, end_ms=end_ms)
+
+    def get_depth(self, market: str, *, depth: Optional[int] = None, max_age_secs: float = 0) -> Res:
         """
         Returns the order book in a market (optionally to a depth)
 
@@ -320,10 +373,27 @@ class Perps:
 
         Request Query Parameters:
         - market: trading market (e.g. AVAX-USDC).
-        - depth: maximum number of results to return (e.g. 10). Optional."""
+        - depth: maximum number of results to return (e.g. 10). Optional.
+
+        Repeated calls are revalidated with the previous response's ETag, and reuse it if not modified.
+        `max_age_secs` reuses the previous response without a request while it is younger than that (e.g. 0.05).
+        Off by default.
+
+        To follow the order book continuously, subscribe to its channel with `wsclient.WebSocketClient`
+        (pushed updates) instead of polling this endpoint."""
 
-        query = {"market": market, "depth": depth}
-        return self.bc.get("/v1/perps/depth", params=query)
+        query = _baseclient.filter_none(market=market, depth=depth)
+        return self.bc.get("/v1/perps/depth", params=query, conditional=True, max_age_secs=max_age_secs)
+
+    def get_depth_multi(
+        self, markets: List[str], *, depth: Optional[int] = None, max_age_secs: float = 0
+    ) -> Dict[str, Res]:
+        """Returns the order books of several markets by market, requested concurrently (see `get_depth`).
+
+        `GET /v1/perps/depth` for each market"""
+
+        books = self.bc.map(self.get_depth, markets, depth=depth, max_age_secs=max_age_secs)
+        return dict(zip(markets, books))
 
     def get_fills(
         self,
@@ -333,6 +403,7 @@ class Perps:
         market: Optional[str] = None,
         start_ms: Optional[int] = None,
         end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
     ) -> Res:
         """
         Get fills that meet the optional parameters.
@@ -344,35 +415,56 @@ class Perps:
         - cursor: The cursor to use for pagination (e.g. NQ5WWO3THN3Q====). Optional.
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
 
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "market": market,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/perps/fills", params=query)
+        `max_age_secs` reuses the previous response for the same parameters without a request
+        while it is younger than that (e.g. 0.25). Off by default.
+        Placing or cancelling orders through this client forgets the kept order and fill responses."""
+
+        query = _baseclient.filter_none(limit=limit, cursor=cursor, market=market, startTime=start_ms, endTime=end_ms)
+        return self.bc.get("/v1/perps/fills", params=query, max_age_secs=max_age_secs)
+
+    def iter_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over all fills that meet the optional parameters, following the pagination cursor across pages.
+        Takes the same parameters as `get_fills` (`limit` sets the page size).
+
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(self.get_fills, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms)
 
     def get_fills_by_id(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
         """
         Fills by Order ID
         Exactly one of client_order_id (clientOrderID) or internal order_id (orderID) must be provided.
 
-        `GET /v1/perps/fills/client:{clientOrderID}` if client_order_id
+        `GET /v1/perps/orders/client:{clientOrderID}/fills` if client_order_id
         or
         `GET /v1/perps/orders/{orderID}/fills` if order_id (internal)"""
 
-        if (not any((client_order_id, order_id))) or all((client_order_id, order_id)):
-            raise ValueError("Must provide exactly one of client_order_id or order_id")
+        _baseclient.require_one(client_order_id, order_id, "client_order_id", "order_id")
 
-        path = f"client:{client_order_id}" if client_order_id else order_id
+        path = (
+            f"/v1/perps/orders/client:{client_order_id}/fills"
+            if client_order_id
+            else f"/v1/perps/orders/{order_id}/fills"
+        )
 
-        return self.bc.get(f"/v1/perps/orders/{path}/fills")
+        return self.bc.get(path)
 
     def get_fills_csv(
-        self, market: Optional[str] = None, *, start_ms: Optional[int] = None, end_ms: Optional[int] = None
+        self,
+        market: Optional[str] = None,
+        *,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        stream: bool = False,
     ) -> Res:
         """
         Export CSV of filled orders that meet the optional parameters.
@@ -382,14 +474,27 @@ class Perps:
         Request Query Parameters:
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
 
-        query = {
-            "market": market,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/perps/fills/csv", params=query)
+        `stream` returns before the CSV is downloaded, to be read line by line with `Response.iter_lines()`
+        instead of being held in memory at once. Close the response if it is not read to the end."""
+
+        query = _baseclient.filter_none(market=market, startTime=start_ms, endTime=end_ms)
+        return self.bc.get("/v1/perps/fills/csv", params=query, stream=stream)
+
+    def iter_fills_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[List[str]]:
+        """Iterate over the rows of the CSV export of fills (header first) as it downloads,
+        without holding the whole export in memory. Takes the same parameters as `get_fills_csv`.
+
+        Raises `requests.HTTPError` if the request fails."""
+
+        return _baseclient.read_csv(self.get_fills_csv, market=market, start_ms=start_ms, end_ms=end_ms)
 
     def cancel_orders(self, market: Optional[str] = None) -> Res:
         """
@@ -401,7 +506,10 @@ class Perps:
         - market: The market to cancel all orders in (e.g. AVAX-USDC). Optional.
         If no market is provided, all orders for all markets will be cancelled."""
 
-        return self.bc.delete("/v1/perps/orders", params={"market": market})
+        try:
+            return self.bc.delete("/v1/perps/orders", params=_baseclient.filter_none(market=market))
+        finally:
+            self.bc.clear_cache("/v1/perps/orders", "/v1/perps/fills")
 
     def cancel_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
         """
@@ -416,22 +524,24 @@ class Perps:
         - client_order_id: The client order ID to cancel (e.g. abc123). Optional.
         - order_id: The internal order ID to cancel (e.g. 197ec08e001658690721be129e7fa595). Optional."""
 
-        if (not any((client_order_id, order_id))) or all((client_order_id, order_id)):
-            raise ValueError("Must provide exactly one of client_order_id or order_id")
+        _baseclient.require_one(client_order_id, order_id, "client_order_id", "order_id")
 
-        path = f"client:{client_order_id}" if client_order_id else str(order_id)
+        path = f"/v1/perps/orders/client:{client_order_id}" if client_order_id else f"/v1/perps/orders/{order_id}"
 
-        return self.bc.delete(f"/v1/perps/orders/{path}")
+        try:
+            return self.bc.delete(path)
+        finally:
+            self.bc.clear_cache("/v1/perps/orders", "/v1/perps/fills")
 
     def add_order(
         self,
         market: str,
         side: str,
-        price: Optional[Decimal] = None,
-        size: Optional[Decimal] = None,
+        price: Optional[Union[Decimal, str]] = None,
+        size: Optional[Union[Decimal, str]] = None,
         *,
         client_order_id: Optional[str] = None,
-        quote_size: Optional[Decimal] = None,
+        quote_size: Optional[Union[Decimal, str]] = None,
         order_type: Optional[str] = None,
         time_in_force: Optional[str] = None,
         post_only: Optional[bool] = None,
@@ -456,19 +566,417 @@ class Perps:
         - order_type: The order type, “limit” or “market” (e.g. "limit"). Optional, defaults to “limit”.
         - time_in_force: “GTC” or “IOC” - Good until canceled / Immediate or cancel. Cannot be set for market orders (e.g. "IOC"). Optional, defaults to “GTC”.
         - post_only: Whether an order should be prohibited from filling on placement (e.g. True). Optional, defaults to False.
+
+        price, size and quote_size can be Decimals or strings. Strings are sent as is,
+        so prices already formatted as strings (e.g. from market data) need no Decimal conversion.
         """
 
-        body = {
-            "market": market,
-            "price": str(price) if price else None,
-            "side": side,
-            "size": str(size) if size else None,
-            "clientOrderId": client_order_id,
-            "quoteSize": str(quote_size) if quote_size else None,
-            "type": order_type,
-            "timeInForce": time_in_force,
-            "postOnly": post_only,
-        }
-        body_filtered = {k: v for k, v in body.items() if v is not None}  # filter None
+        body: Dict[str, Any] = {"market": market}
+        if price is not None:
+            body["price"] = _baseclient.decimal_str(price)
+        body["side"] = side
+        if size is not None:
+            body["size"] = _baseclient.decimal_str(size)
+        if client_order_id is not None:
+            body["clientOrderId"] = client_order_id
+        if quote_size is not None:
+            body["quoteSize"] = _baseclient.decimal_str(quote_size)
+        if order_type is not None:
+            body["type"] = order_type
+        if time_in_force is not None:
+            body["timeInForce"] = time_in_force
+        if post_only is not None:
+            body["postOnly"] = post_only
+
+        try:  # a request that timed out may still have reached the exchange
+            return self.bc.post("/v1/perps/orders", body=_baseclient.dumps(body))
+        finally:
+            self.bc.clear_cache("/v1/perps/orders", "/v1/perps/fills")  # the order may be listed or filled already
+
+    def submit_order(
+        self,
+        market: str,
+        side: str,
+        price: Optional[Union[Decimal, str]] = None,
+        size: Optional[Union[Decimal, str]] = None,
+        *,
+        client_order_id: Optional[str] = None,
+        quote_size: Optional[Union[Decimal, str]] = None,
+        order_type: Optional[str] = None,
+        time_in_force: Optional[str] = None,
+        post_only: Optional[bool] = None,
+    ) -> "Future[Res]":
+        """Submit `add_order` on a background thread and return a Future of its response without waiting for it,
+        so further orders can be placed while this one is in flight.
+
+        Submitted orders are not guaranteed to reach the exchange in submission order;
+        wait for the Future's result before submitting an order that must come after it."""
+
+        return self.bc.submit(
+            self.add_order,
+            market,
+            side,
+            price,
+            size,
+            client_order_id=client_order_id,
+            quote_size=quote_size,
+            order_type=order_type,
+            time_in_force=time_in_force,
+            post_only=post_only,
+        )
+
+
+class AsyncPerps:
+    """AsyncPerps is the async version of Perps.
+    Each method makes the same request as its Perps counterpart on the AsyncBaseClient's thread pool,
+    so independent requests can run concurrently, e.g. `await asyncio.gather(perps.get_positions(), perps.get_balance())`.
+
+    Designed to be used as `AsyncClient(...).perps.a_perps_endpoint(...)` and not initialized directly.
+
+    See `Perps` for the documentation of each endpoint.
+    """
+
+    def __init__(self, base_client: _baseclient.AsyncBaseClient):
+        self.bc = base_client
+        self._perps = Perps(base_client.bc)
+
+    ### Perps specific APIs
+
+    async def get_positions(self) -> Res:
+        """Gets list of all positions for all markets
+
+        `GET /v1/perps/positions`"""
+        return await self.bc.run(self._perps.get_positions)
+
+    async def transfer(self, symbol: str, amount: Union[Decimal, str]) -> Res:
+        """Make a transfer between your main wallet and margin account, see `Perps.transfer`.
+
+        `POST /v1/perps/transfers`"""
+        return await self.bc.run(self._perps.transfer, symbol, amount)
+
+    async def get_balance(self) -> Res:
+        """Get a summary of the balance for a margin account, with a high-level breakdown.
+
+        `GET /v1/perps/balance`"""
+        return await self.bc.run(self._perps.get_balance)
+
+    async def get_funding_rates(self, market: str, *, max_age_secs: float = 0) -> Res:
+        """Get an estimate of the current-interval funding rate in a given market, see `Perps.get_funding_rates`.
+
+        `GET /v1/perps/funding_rates`"""
+        return await self.bc.run(self._perps.get_funding_rates, market, max_age_secs=max_age_secs)
+
+    async def get_funding_rate_history(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Res:
+        """Get the historical funding rate in a market, see `Perps.get_funding_rate_history`.
+
+        `GET /v1/perps/funding_rate_history`"""
+        return await self.bc.run(
+            self._perps.get_funding_rate_history,
+            limit=limit,
+            cursor=cursor,
+            market=market,
+            start_ms=start_ms,
+            end_ms=end_ms,
+        )
+
+    def iter_funding_rate_history(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over the historical funding rates, see `iter_funding_rate_history`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(
+            self.get_funding_rate_history, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms
+        )
+
+    async def get_funding_fees(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Res:
+        """Get the historical funding fee payments in a market, see `Perps.get_funding_fees`.
+
+        `GET /v1/perps/funding_fees`"""
+        return await self.bc.run(
+            self._perps.get_funding_fees, limit=limit, cursor=cursor, market=market, start_ms=start_ms, end_ms=end_ms
+        )
+
+    def iter_funding_fees(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over the historical funding fee payments, see `iter_funding_fees`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(
+            self.get_funding_fees, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms
+        )
+
+    async def get_transfers(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Res:
+        """List all your margin account transfers, see `Perps.get_transfers`.
+
+        `GET /v1/perps/transfers`"""
+        return await self.bc.run(
+            self._perps.get_transfers, limit=limit, cursor=cursor, start_ms=start_ms, end_ms=end_ms
+        )
+
+    def iter_transfers(
+        self,
+        *,
+        limit: Optional[int] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over all margin account transfers, see `iter_transfers`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(self.get_transfers, limit=limit, start_ms=start_ms, end_ms=end_ms)
+
+    async def get_stop_orders(self) -> Res:
+        """Gets list of all stop orders for all markets
+
+        `GET /v1/perps/stop_order`"""
+        return await self.bc.run(self._perps.get_stop_orders)
+
+    async def set_stop_order(
+        self,
+        market: str,
+        position_direction: str,
+        order_type: str,
+        trigger_price: Union[Decimal, str],
+    ) -> Res:
+        """Set a stop order for a particular position defined by market and direction, see `Perps.set_stop_order`.
+
+        `POST /v1/perps/stop_order`"""
+        return await self.bc.run(self._perps.set_stop_order, market, position_direction, order_type, trigger_price)
+
+    async def remove_stop_order(self, market: str, *, order_type: Optional[str] = None) -> Res:
+        """Remove a stop order for a particular position defined by market and direction, see `Perps.remove_stop_order`.
+
+        `DELETE /v1/perps/stop_order`"""
+        return await self.bc.run(self._perps.remove_stop_order, market, order_type=order_type)
+
+    ### Shared API with Spot
+
+    async def get_orders(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
+    ) -> Res:
+        """Get orders that meet the optional parameters, see `Perps.get_orders`.
+
+        `GET /v1/perps/orders`"""
+        return await self.bc.run(
+            self._perps.get_orders,
+            limit=limit,
+            cursor=cursor,
+            market=market,
+            status=status,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            max_age_secs=max_age_secs,
+        )
+
+    def iter_orders(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over all orders that meet the optional parameters, see `iter_orders`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(
+            self.get_orders, limit=limit, market=market, status=status, start_ms=start_ms, end_ms=end_ms
+        )
+
+    async def get_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
+        """Get an order by client order ID or internal order ID, see `Perps.get_order`.
+
+        `GET /v1/perps/orders/{orderID}` or `GET /v1/perps/orders/client:{clientOrderID}`"""
+        return await self.bc.run(self._perps.get_order, client_order_id=client_order_id, order_id=order_id)
+
+    async def get_orders_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        stream: bool = False,
+    ) -> Res:
+        """Export CSV of orders that meet the optional parameters, see `Perps.get_orders_csv`.
+
+        `GET /v1/perps/orders/csv`"""
+        return await self.bc.run(
+            self._perps.get_orders_csv,
+            market=market,
+            status=status,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            stream=stream,
+        )
+
+    def iter_orders_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[List[str]]:
+        """Async iterate over the rows of the CSV export of orders as it downloads, see `Perps.iter_orders_csv`."""
+        return _baseclient.aread_csv(
+            self.bc, self.get_orders_csv, market=market, status=status, start_ms=start_ms, end_ms=end_ms
+        )
+
+    async def get_depth(self, market: str, *, depth: Optional[int] = None, max_age_secs: float = 0) -> Res:
+        """Returns the order book in a market (optionally to a depth), see `Perps.get_depth`.
+
+        `GET /v1/perps/depth`"""
+        return await self.bc.run(self._perps.get_depth, market, depth=depth, max_age_secs=max_age_secs)
+
+    async def get_depth_multi(
+        self, markets: List[str], *, depth: Optional[int] = None, max_age_secs: float = 0
+    ) -> Dict[str, Res]:
+        """Returns the order books of several markets by market, requested concurrently, see `Perps.get_depth_multi`.
+
+        `GET /v1/perps/depth` for each market"""
+        books = await asyncio.gather(*(self.get_depth(m, depth=depth, max_age_secs=max_age_secs) for m in markets))
+        return dict(zip(markets, books))
+
+    async def get_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
+    ) -> Res:
+        """Get fills that meet the optional parameters, see `Perps.get_fills`.
+
+        `GET /v1/perps/fills`"""
+        return await self.bc.run(
+            self._perps.get_fills,
+            limit=limit,
+            cursor=cursor,
+            market=market,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            max_age_secs=max_age_secs,
+        )
+
+    def iter_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over all fills that meet the optional parameters, see `iter_fills`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(self.get_fills, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms)
 
-        return self.bc.post("/v1/perps/orders", body=json.dumps(body_filtered))
+    async def get_fills_by_id(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
+        """Fills by client order ID or internal order ID, see `Perps.get_fills_by_id`."""
+        return await self.bc.run(self._perps.get_fills_by_id, client_order_id=client_order_id, order_id=order_id)
+
+    async def get_fills_csv(
+        self,
+        market: Optional[str] = None,
+        *,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        stream: bool = False,
+    ) -> Res:
+        """Export CSV of filled orders that meet the optional parameters, see `Perps.get_fills_csv`.
+
+        `GET /v1/perps/fills/csv`"""
+        return await self.bc.run(self._perps.get_fills_csv, market, start_ms=start_ms, end_ms=end_ms, stream=stream)
+
+    def iter_fills_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[List[str]]:
+        """Async iterate over the rows of the CSV export of fills as it downloads, see `Perps.iter_fills_csv`."""
+        return _baseclient.aread_csv(self.bc, self.get_fills_csv, market=market, start_ms=start_ms, end_ms=end_ms)
+
+    async def cancel_orders(self, market: Optional[str] = None) -> Res:
+        """Cancel all orders (optionally per market).
+
+        `DELETE /v1/perps/orders`"""
+        return await self.bc.run(self._perps.cancel_orders, market)
+
+    async def cancel_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
+        """Cancel an order by client order ID or internal order ID, see `Perps.cancel_order`.
+
+        `DELETE /v1/perps/orders/{orderID}` or `DELETE /v1/perps/orders/client:{clientOrderID}`"""
+        return await self.bc.run(self._perps.cancel_order, client_order_id=client_order_id, order_id=order_id)
+
+    async def add_order(
+        self,
+        market: str,
+        side: str,
+        price: Optional[Union[Decimal, str]] = None,
+        size: Optional[Union[Decimal, str]] = None,
+        *,
+        client_order_id: Optional[str] = None,
+        quote_size: Optional[Union[Decimal, str]] = None,
+        order_type: Optional[str] = None,
+        time_in_force: Optional[str] = None,
+        post_only: Optional[bool] = None,
+    ) -> Res:
+        """Creates an order, see `Perps.add_order`.
+
+        `POST /v1/perps/orders`"""
+        return await self.bc.run(
+            self._perps.add_order,
+            market,
+            side,
+            price,
+            size,
+            client_order_id=client_order_id,
+            quote_size=quote_size,
+            order_type=order_type,
+            time_in_force=time_in_force,
+            post_only=post_only,
+        )
@@ -1,9 +1,11 @@
 """
 spot implements the Spot specific API and calls an instance of BaseClient to make requests and handle auth.
 """
-import json
+
+import asyncio
+from concurrent.futures import Future
 from decimal import Decimal
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
 from . import _baseclient
 from .models import Res
@@ -31,6 +33,7 @@ class Spot:
         status: Optional[str] = None,
         start_ms: Optional[int] = None,
         end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
     ) -> Res:
         """
         Get orders that meet the optional parameters.
@@ -43,17 +46,34 @@ class Spot:
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - status: The status to filter orders by (e.g. open). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
-
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "market": market,
-            "status": status,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/orders", params=query)
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
+
+        `max_age_secs` reuses the previous response for the same parameters without a request
+        while it is younger than that (e.g. 0.25). Off by default.
+        Placing or cancelling orders through this client forgets the kept order and fill responses."""
+
+        query = _baseclient.filter_none(
+            limit=limit, cursor=cursor, market=market, status=status, startTime=start_ms, endTime=end_ms
+        )
+        return self.bc.get("/v1/orders", params=query, max_age_secs=max_age_secs)
+
+    def iter_orders(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over all orders that meet the optional parameters, following the pagination cursor across pages.
+        Takes the same parameters as `get_orders` (`limit` sets the page size).
+
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(
+            self.get_orders, limit=limit, market=market, status=status, start_ms=start_ms, end_ms=end_ms
+        )
 
     def get_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
         """
@@ -68,12 +88,11 @@ class Spot:
         - client_order_id: The client order ID to retrieve (e.g. abc123). Optional.
         - order_id: The internal order ID to retrieve (e.g. 197ec08e001658690721be129e7fa595). Optional."""
 
-        if (not any((client_order_id, order_id))) or all((client_order_id, order_id)):
-            raise ValueError("Must provide exactly one of client_order_id or order_id")
+        _baseclient.require_one(client_order_id, order_id, "client_order_id", "order_id")
 
-        path = f"client:{client_order_id}" if client_order_id else str(order_id)
+        path = f"/v1/orders/client:{client_order_id}" if client_order_id else f"/v1/orders/{order_id}"
 
-        return self.bc.get(f"/v1/orders/{path}")
+        return self.bc.get(path)
 
     def get_orders_csv(
         self,
@@ -82,6 +101,7 @@ class Spot:
         status: Optional[str] = None,
         start_ms: Optional[int] = None,
         end_ms: Optional[int] = None,
+        stream: bool = False,
     ) -> Res:
         """
         Export CSV of orders that meet the optional parameters.
@@ -92,17 +112,30 @@ class Spot:
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - status: The status to filter orders by (e.g. open). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
 
-        query = {
-            "market": market,
-            "status": status,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/orders/csv", params=query)
+        `stream` returns before the CSV is downloaded, to be read line by line with `Response.iter_lines()`
+        instead of being held in memory at once. Close the response if it is not read to the end."""
 
-    def get_depth(self, market: str, *, depth: Optional[int] = None) -> Res:
+        query = _baseclient.filter_none(market=market, status=status, startTime=start_ms, endTime=end_ms)
+        return self.bc.get("/v1/orders/csv", params=query, stream=stream)
+
+    def iter_orders_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[List[str]]:
+        """Iterate over the rows of the CSV export of orders (header first) as it downloads,
+        without holding the whole export in memory. Takes the same parameters as `get_orders_csv`.
+
+        Raises `requests.HTTPError` if the request fails."""
+
+        return _baseclient.read_csv(self.get_orders_csv, market=market, status=status, start_ms=start_ms, end_ms=end_ms)
+
+    def get_depth(self, market: str, *, depth: Optional[int] = None, max_age_secs: float = 0) -> Res:
         """
         Returns the order book in a market (optionally to a depth)
 
@@ -110,10 +143,27 @@ class Spot:
 
         Request Query Parameters:
         - market: trading market (e.g. AVAX-USDC).
-        - depth: maximum number of results to return (e.g. 10). Optional."""
+        - depth: maximum number of results to return (e.g. 10). Optional.
+
+        Repeated calls are revalidated with the previous response's ETag, and reuse it if not modified.
+        `max_age_secs` reuses the previous response without a request while it is younger than that (e.g. 0.05).
+        Off by default.
+
+        To follow the order book continuously, subscribe to its channel with `wsclient.WebSocketClient`
+        (pushed updates) instead of polling this endpoint."""
+
+        query = _baseclient.filter_none(market=market, depth=depth)
+        return self.bc.get("/v1/depth", params=query, conditional=True, max_age_secs=max_age_secs)
+
+    def get_depth_multi(
+        self, markets: List[str], *, depth: Optional[int] = None, max_age_secs: float = 0
+    ) -> Dict[str, Res]:
+        """Returns the order books of several markets by market, requested concurrently (see `get_depth`).
+
+        `GET /v1/depth` for each market"""
 
-        query = {"market": market, "depth": depth}
-        return self.bc.get("/v1/depth", params=query)
+        books = self.bc.map(self.get_depth, markets, depth=depth, max_age_secs=max_age_secs)
+        return dict(zip(markets, books))
 
     def get_fills(
         self,
@@ -123,6 +173,7 @@ class Spot:
         market: Optional[str] = None,
         start_ms: Optional[int] = None,
         end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
     ) -> Res:
         """
         Get fills that meet the optional parameters.
@@ -134,16 +185,29 @@ class Spot:
         - cursor: The cursor to use for pagination (e.g. NQ5WWO3THN3Q====). Optional.
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
+
+        `max_age_secs` reuses the previous response for the same parameters without a request
+        while it is younger than that (e.g. 0.25). Off by default.
+        Placing or cancelling orders through this client forgets the kept order and fill responses."""
+
+        query = _baseclient.filter_none(limit=limit, cursor=cursor, market=market, startTime=start_ms, endTime=end_ms)
+        return self.bc.get("/v1/fills", params=query, max_age_secs=max_age_secs)
+
+    def iter_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Iterate over all fills that meet the optional parameters, following the pagination cursor across pages.
+        Takes the same parameters as `get_fills` (`limit` sets the page size).
 
-        query = {
-            "limit": limit,
-            "cursor": cursor,
-            "market": market,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/fills", params=query)
+        Raises `requests.HTTPError` if a page request fails."""
+
+        return self.bc.paginate(self.get_fills, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms)
 
     def get_fills_by_id(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
         """
@@ -154,15 +218,19 @@ class Spot:
         or
         `GET /v1/orders/{orderID}/fills` if order_id (internal)"""
 
-        if (not any((client_order_id, order_id))) or all((client_order_id, order_id)):
-            raise ValueError("Must provide exactly one of client_order_id or order_id")
+        _baseclient.require_one(client_order_id, order_id, "client_order_id", "order_id")
 
-        path = f"client:{client_order_id}" if client_order_id else order_id
+        path = f"/v1/orders/client:{client_order_id}/fills" if client_order_id else f"/v1/orders/{order_id}/fills"
 
-        return self.bc.get(f"/v1/orders/{path}/fills")
+        return self.bc.get(path)
 
     def get_fills_csv(
-        self, market: Optional[str] = None, *, start_ms: Optional[int] = None, end_ms: Optional[int] = None
+        self,
+        market: Optional[str] = None,
+        *,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        stream: bool = False,
     ) -> Res:
         """
         Export CSV of filled orders that meet the optional parameters.
@@ -172,14 +240,27 @@ class Spot:
         Request Query Parameters:
         - market: The market to filter orders by (e.g. AVAX-USDC). Optional.
         - start_ms: The unix start time in milliseconds to filter orders by (e.g. 1684814400000). Optional.
-        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional."""
+        - end_ms: The unix end time in milliseconds to filter orders by (e.g. 1672549200000). Optional.
+
+        `stream` returns before the CSV is downloaded, to be read line by line with `Response.iter_lines()`
+        instead of being held in memory at once. Close the response if it is not read to the end."""
+
+        query = _baseclient.filter_none(market=market, startTime=start_ms, endTime=end_ms)
+        return self.bc.get("/v1/fills/csv", params=query, stream=stream)
+
+    def iter_fills_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> Iterator[List[str]]:
+        """Iterate over the rows of the CSV export of fills (header first) as it downloads,
+        without holding the whole export in memory. Takes the same parameters as `get_fills_csv`.
 
-        query = {
-            "market": market,
-            "startTime": start_ms,
-            "endTime": end_ms,
-        }
-        return self.bc.get("/v1/fills/csv", params=query)
+        Raises `requests.HTTPError` if the request fails."""
+
+        return _baseclient.read_csv(self.get_fills_csv, market=market, start_ms=start_ms, end_ms=end_ms)
 
     def cancel_orders(self, market: Optional[str] = None) -> Res:
         """
@@ -191,7 +272,10 @@ class Spot:
         - market: The market to cancel all orders in (e.g. AVAX-USDC). Optional.
         If no market is provided, all orders for all markets will be cancelled."""
 
-        return self.bc.delete("/v1/orders", params={"market": market})
+        try:
+            return self.bc.delete("/v1/orders", params=_baseclient.filter_none(market=market))
+        finally:
+            self.bc.clear_cache("/v1/orders", "/v1/fills")
 
     def cancel_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
         """
@@ -206,22 +290,24 @@ class Spot:
         - client_order_id: The client order ID to cancel (e.g. abc123). Optional.
         - order_id: The internal order ID to cancel (e.g. 197ec08e001658690721be129e7fa595). Optional."""
 
-        if (not any((client_order_id, order_id))) or all((client_order_id, order_id)):
-            raise ValueError("Must provide exactly one of client_order_id or order_id")
+        _baseclient.require_one(client_order_id, order_id, "client_order_id", "order_id")
 
-        path = f"client:{client_order_id}" if client_order_id else str(order_id)
+        path = f"/v1/orders/client:{client_order_id}" if client_order_id else f"/v1/orders/{order_id}"
 
-        return self.bc.delete(f"/v1/orders/{path}")
+        try:
+            return self.bc.delete(path)
+        finally:
+            self.bc.clear_cache("/v1/orders", "/v1/fills")
 
     def add_order(
         self,
         market: str,
         side: str,
-        price: Optional[Decimal] = None,
-        size: Optional[Decimal] = None,
+        price: Optional[Union[Decimal, str]] = None,
+        size: Optional[Union[Decimal, str]] = None,
         *,
         client_order_id: Optional[str] = None,
-        quote_size: Optional[Decimal] = None,
+        quote_size: Optional[Union[Decimal, str]] = None,
         order_type: Optional[str] = None,
         time_in_force: Optional[str] = None,
         post_only: Optional[bool] = None,
@@ -246,19 +332,274 @@ class Spot:
         - order_type: The order type, “limit” or “market” (e.g. "limit"). Optional, defaults to “limit”.
         - time_in_force: “GTC” or “IOC” - Good until canceled / Immediate or cancel. Cannot be set for market orders (e.g. "IOC"). Optional, defaults to “GTC”.
         - post_only: Whether an order should be prohibited from filling on placement (e.g. True). Optional, defaults to False.
+
+        price, size and quote_size can be Decimals or strings. Strings are sent as is,
+        so prices already formatted as strings (e.g. from market data) need no Decimal conversion.
         """
 
-        body = {
-            "market": market,
-            "price": str(price) if price else None,
-            "side": side,
-            "size": str(size) if size else None,
-            "clientOrderId": client_order_id,
-            "quoteSize": str(quote_size) if quote_size else None,
-            "type": order_type,
-            "timeInForce": time_in_force,
-            "postOnly": post_only,
-        }
-        body_filtered = {k: v for k, v in body.items() if v is not None}  # filter None
-
-        return self.bc.post("/v1/orders", body=json.dumps(body_filtered))
+        body: Dict[str, Any] = {"market": market}
+        if price is not None:
+            body["price"] = _baseclient.decimal_str(price)
+        body["side"] = side
+        if size is not None:
+            body["size"] = _baseclient.decimal_str(size)
+        if client_order_id is not None:
+            body["clientOrderId"] = client_order_id
+        if quote_size is not None:
+            body["quoteSize"] = _baseclient.decimal_str(quote_size)
+        if order_type is not None:
+            body["type"] = order_type
+        if time_in_force is not None:
+            body["timeInForce"] = time_in_force
+        if post_only is not None:
+            body["postOnly"] = post_only
+
+        try:  # a request that timed out may still have reached the exchange
+            return self.bc.post("/v1/orders", body=_baseclient.dumps(body))
+        finally:
+            self.bc.clear_cache("/v1/orders", "/v1/fills")  # the order may be listed or filled already
+
+    def submit_order(
+        self,
+        market: str,
+        side: str,
+        price: Optional[Union[Decimal, str]] = None,
+        size: Optional[Union[Decimal, str]] = None,
+        *,
+        client_order_id: Optional[str] = None,
+        quote_size: Optional[Union[Decimal, str]] = None,
+        order_type: Optional[str] = None,
+        time_in_force: Optional[str] = None,
+        post_only: Optional[bool] = None,
+    ) -> "Future[Res]":
+        """Submit `add_order` on a background thread and return a Future of its response without waiting for it,
+        so further orders can be placed while this one is in flight.
+
+        Submitted orders are not guaranteed to reach the exchange in submission order;
+        wait for the Future's result before submitting an order that must come after it."""
+
+        return self.bc.submit(
+            self.add_order,
+            market,
+            side,
+            price,
+            size,
+            client_order_id=client_order_id,
+            quote_size=quote_size,
+            order_type=order_type,
+            time_in_force=time_in_force,
+            post_only=post_only,
+        )
+
+
+class AsyncSpot:
+    """AsyncSpot is the async version of Spot.
+    Each method makes the same request as its Spot counterpart on the AsyncBaseClient's thread pool,
+    so independent requests can run concurrently, e.g. `await asyncio.gather(spot.get_depth(m1), spot.get_depth(m2))`.
+
+    Designed to be used as `AsyncClient(...).spot.a_spot_endpoint(...)` and not initialized directly.
+
+    See `Spot` for the documentation of each endpoint.
+    """
+
+    def __init__(self, base_client: _baseclient.AsyncBaseClient):
+        self.bc = base_client
+        self._spot = Spot(base_client.bc)
+
+    async def get_orders(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
+    ) -> Res:
+        """Get orders that meet the optional parameters, see `Spot.get_orders`.
+
+        `GET /v1/orders`"""
+        return await self.bc.run(
+            self._spot.get_orders,
+            limit=limit,
+            cursor=cursor,
+            market=market,
+            status=status,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            max_age_secs=max_age_secs,
+        )
+
+    def iter_orders(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over all orders that meet the optional parameters, see `iter_orders`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(
+            self.get_orders, limit=limit, market=market, status=status, start_ms=start_ms, end_ms=end_ms
+        )
+
+    async def get_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
+        """Get an order by client order ID or internal order ID, see `Spot.get_order`.
+
+        `GET /v1/orders/{orderID}` or `GET /v1/orders/client:{clientOrderID}`"""
+        return await self.bc.run(self._spot.get_order, client_order_id=client_order_id, order_id=order_id)
+
+    async def get_orders_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        stream: bool = False,
+    ) -> Res:
+        """Export CSV of orders that meet the optional parameters, see `Spot.get_orders_csv`.
+
+        `GET /v1/orders/csv`"""
+        return await self.bc.run(
+            self._spot.get_orders_csv,
+            market=market,
+            status=status,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            stream=stream,
+        )
+
+    def iter_orders_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        status: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[List[str]]:
+        """Async iterate over the rows of the CSV export of orders as it downloads, see `Spot.iter_orders_csv`."""
+        return _baseclient.aread_csv(
+            self.bc, self.get_orders_csv, market=market, status=status, start_ms=start_ms, end_ms=end_ms
+        )
+
+    async def get_depth(self, market: str, *, depth: Optional[int] = None, max_age_secs: float = 0) -> Res:
+        """Returns the order book in a market (optionally to a depth), see `Spot.get_depth`.
+
+        `GET /v1/depth`"""
+        return await self.bc.run(self._spot.get_depth, market, depth=depth, max_age_secs=max_age_secs)
+
+    async def get_depth_multi(
+        self, markets: List[str], *, depth: Optional[int] = None, max_age_secs: float = 0
+    ) -> Dict[str, Res]:
+        """Returns the order books of several markets by market, requested concurrently, see `Spot.get_depth_multi`.
+
+        `GET /v1/depth` for each market"""
+        books = await asyncio.gather(*(self.get_depth(m, depth=depth, max_age_secs=max_age_secs) for m in markets))
+        return dict(zip(markets, books))
+
+    async def get_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        max_age_secs: float = 0,
+    ) -> Res:
+        """Get fills that meet the optional parameters, see `Spot.get_fills`.
+
+        `GET /v1/fills`"""
+        return await self.bc.run(
+            self._spot.get_fills,
+            limit=limit,
+            cursor=cursor,
+            market=market,
+            start_ms=start_ms,
+            end_ms=end_ms,
+            max_age_secs=max_age_secs,
+        )
+
+    def iter_fills(
+        self,
+        *,
+        limit: Optional[int] = None,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Async iterate over all fills that meet the optional parameters, see `iter_fills`.
+        The next page is requested while the current one is consumed."""
+        return _baseclient.apaginate(self.get_fills, limit=limit, market=market, start_ms=start_ms, end_ms=end_ms)
+
+    async def get_fills_by_id(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
+        """Fills by client order ID or internal order ID, see `Spot.get_fills_by_id`."""
+        return await self.bc.run(self._spot.get_fills_by_id, client_order_id=client_order_id, order_id=order_id)
+
+    async def get_fills_csv(
+        self,
+        market: Optional[str] = None,
+        *,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        stream: bool = False,
+    ) -> Res:
+        """Export CSV of filled orders that meet the optional parameters, see `Spot.get_fills_csv`.
+
+        `GET /v1/fills/csv`"""
+        return await self.bc.run(self._spot.get_fills_csv, market, start_ms=start_ms, end_ms=end_ms, stream=stream)
+
+    def iter_fills_csv(
+        self,
+        *,
+        market: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> AsyncIterator[List[str]]:
+        """Async iterate over the rows of the CSV export of fills as it downloads, see `Spot.iter_fills_csv`."""
+        return _baseclient.aread_csv(self.bc, self.get_fills_csv, market=market, start_ms=start_ms, end_ms=end_ms)
+
+    async def cancel_orders(self, market: Optional[str] = None) -> Res:
+        """Cancel all orders (optionally per market).
+
+        `DELETE /v1/orders`"""
+        return await self.bc.run(self._spot.cancel_orders, market)
+
+    async def cancel_order(self, *, client_order_id: Optional[str] = None, order_id: Optional[str] = None) -> Res:
+        """Cancel an order by client order ID or internal order ID, see `Spot.cancel_order`.
+
+        `DELETE /v1/orders/{orderID}` or `DELETE /v1/orders/client:{clientOrderID}`"""
+        return await self.bc.run(self._spot.cancel_order, client_order_id=client_order_id, order_id=order_id)
+
+    async def add_order(
+        self,
+        market: str,
+        side: str,
+        price: Optional[Union[Decimal, str]] = None,
+        size: Optional[Union[Decimal, str]] = None,
+        *,
+        client_order_id: Optional[str] = None,
+        quote_size: Optional[Union[Decimal, str]] = None,
+        order_type: Optional[str] = None,
+        time_in_force: Optional[str] = None,
+        post_only: Optional[bool] = None,
+    ) -> Res:
+        """Creates a spot order, see `Spot.add_order`.
+
+        `POST /v1/orders`"""
+        return await self.bc.run(
+            self._spot.add_order,
+            market,
+            side,
+            price,
+            size,
+            client_order_id=client_order_id,
+            quote_size=quote_size,
+            order_type=order_type,
+            time_in_force=time_in_force,
+            post_only=post_only,
+        )
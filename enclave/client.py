@@ -7,11 +7,11 @@ Modules beginning with an underscore such as _spot are not intended to be used d
 """
 from __future__ import annotations  # self type only 3.11+
 
-import json
+import asyncio
 import os
 import time
 from decimal import Decimal
-from typing import List, Optional, Union
+from typing import AsyncIterator, Iterator, List, Optional, Union
 
 from . import _baseclient, _cross, _perps, _spot, models
 from .models import Res
@@ -49,6 +49,16 @@ class Client:
 
         return cls(api_key, api_secret, base_url)
 
+    def close(self) -> None:
+        """Close the pooled connections to the API. The Client can also be used as a context manager to do this."""
+        self.bc.close()
+
+    def __enter__(self) -> Client:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     # Common REST API
     # We could pass kwargs and have it unpacked into `get`, but keeping it simple this isn't allowed.
     # https://enclave-markets.notion.site/Common-REST-API-9d546fa6282b4bad87ef43d189b9071b
@@ -61,7 +71,7 @@ class Client:
         Returns True if the API is ready, False if it timed out.
         """
         start = time.time()
-        while not self.bc.get("/status").ok:
+        while not self.bc.get("/status", signed=False, fixed_path=True).ok:
             if fail_after > 0 and ((time.time() - start) > fail_after):
                 return False
             time.sleep(sleep_time)
@@ -72,21 +82,29 @@ class Client:
 
         `GET /authedHello`"""
 
-        return self.bc.get("/authedHello")
+        return self.bc.get("/authedHello", fixed_path=True)
 
-    def get_address_book(self) -> Res:
+    def get_address_book(self, *, max_age_secs: float = 0) -> Res:
         """Make a request to the address book endpoint.
 
-        `GET /v0/address_book`"""
+        `GET /v0/address_book`
+
+        Repeated calls are revalidated with the previous response's ETag, and reuse it if not modified.
+        `max_age_secs` reuses the previous response without a request while it is younger than that (e.g. 60).
+        Off by default."""
 
-        return self.bc.get("/v0/address_book")
+        return self.bc.get("/v0/address_book", conditional=True, max_age_secs=max_age_secs, fixed_path=True)
 
-    def get_markets(self) -> Res:
+    def get_markets(self, *, max_age_secs: float = 0) -> Res:
         """Make a request to the markets endpoint, returns the markets tradeable by the user.
 
-        `GET /v1/markets`"""
+        `GET /v1/markets`
+
+        Repeated calls are revalidated with the previous response's ETag, and reuse it if not modified.
+        `max_age_secs` reuses the previous response without a request while it is younger than that (e.g. 60).
+        Off by default."""
 
-        return self.bc.get("/v1/markets")
+        return self.bc.get("/v1/markets", conditional=True, max_age_secs=max_age_secs, fixed_path=True)
 
     def get_balance(self, coin: str) -> Res:
         """Gets balance of a specific asset.
@@ -97,7 +115,7 @@ class Client:
         `{ "symbol": "COIN" }`
         symbol: str, required."""
 
-        body = f'{{ "symbol": "{coin}" }}'
+        body = _baseclient.dumps({"symbol": coin})
         return self.bc.post("/v0/get_balance", body=body)
 
     def get_balances(self) -> Res:
@@ -105,7 +123,7 @@ class Client:
 
         `GET /v0/wallet/balances`"""
 
-        return self.bc.get("/v0/wallet/balances")
+        return self.bc.get("/v0/wallet/balances", fixed_path=True)
 
     def get_deposit_addresses(self, coins: List[str]) -> Res:
         """Gets all provisioned addresses for the coins for an account.
@@ -115,7 +133,7 @@ class Client:
         Request:
         `{ "coins": ["AVAX", "ETH"] }` list of strings of coin symbols, required."""
 
-        body = json.dumps({"coins": coins})
+        body = _baseclient.dumps({"coins": coins})
         return self.bc.post("/v0/wallet/deposit_address/list", body=body)
 
     def get_deposits(self) -> Res:
@@ -124,7 +142,7 @@ class Client:
 
         `GET /v0/wallet/deposits`"""
 
-        return self.bc.get("/v0/wallet/deposits")
+        return self.bc.get("/v0/wallet/deposits", fixed_path=True)
 
     def get_deposit(self, txid: str) -> Res:
         """Gets a deposit by transaction ID.
@@ -135,25 +153,36 @@ class Client:
 
     # TODO: this is a case where we could have validation. like to check if end is after start and nothing is negative or zero?
     # TODO: this is a response that can't be json encoded by the base class
-    def get_deposits_csv(self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None) -> Res:
+    def get_deposits_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None, stream: bool = False
+    ) -> Res:
         # `*` enforces keyword only arguments
         """Gets deposits for an account within the start and end times (optional)
 
-        `POST /v0/wallet/deposits/csv`"""
+        `POST /v0/wallet/deposits/csv`
+
+        `stream` returns before the CSV is downloaded, to be read line by line with `Response.iter_lines()`
+        instead of being held in memory at once. Close the response if it is not read to the end."""
+
+        body = _baseclient.filter_none(start_time=start_secs, end_time=end_secs)
+        return self.bc.post("/v0/wallet/deposits/csv", body=_baseclient.dumps(body), stream=stream)
 
-        body = {}
-        if start_secs is not None:
-            body["start_time"] = start_secs
-        if end_secs is not None:
-            body["end_time"] = end_secs
-        return self.bc.post("/v0/wallet/deposits/csv", body=json.dumps(body))
+    def iter_deposits_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None
+    ) -> Iterator[List[str]]:
+        """Iterate over the rows of the CSV export of deposits (header first) as it downloads,
+        without holding the whole export in memory. Takes the same parameters as `get_deposits_csv`.
+
+        Raises `requests.HTTPError` if the request fails."""
+
+        return _baseclient.read_csv(self.get_deposits_csv, start_secs=start_secs, end_secs=end_secs)
 
     def get_withdrawals(self) -> Res:
         """Gets all withdrawals for an account.
 
         `GET /v0/wallet/withdrawals`"""
 
-        return self.bc.get("/v0/wallet/withdrawals")
+        return self.bc.get("/v0/wallet/withdrawals", fixed_path=True)
 
     def get_withdrawal(self, *, custom_id: Optional[str] = None, internal_id: Optional[str] = None) -> Res:
         """
@@ -167,11 +196,10 @@ class Client:
         or
         `{"withdrawal_id": internal_id}` if internal_id"""
 
-        if (not any((custom_id, internal_id))) or all((custom_id, internal_id)):
-            raise ValueError("Must provide exactly one of custom_id or internal_id")
+        _baseclient.require_one(custom_id, internal_id, "custom_id", "internal_id")
 
         body = {"customer_withdrawal_id": custom_id} if custom_id else {"withdrawal_id": str(internal_id)}
-        return self.bc.post("/v0/get_withdrawal_status", body=json.dumps(body))
+        return self.bc.post("/v0/get_withdrawal_status", body=_baseclient.dumps(body))
 
     def get_withdrawal_by_txid(self, txid: str) -> Res:
         """Gets a withdrawal by transaction ID.
@@ -180,17 +208,28 @@ class Client:
 
         return self.bc.get(f"/v0/wallet/withdrawals/{txid}")
 
-    def get_withdrawals_csv(self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None) -> Res:
+    def get_withdrawals_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None, stream: bool = False
+    ) -> Res:
         """Gets withdrawals for an account within the start and end times (optional)
 
-        `POST /v0/wallet/withdrawals/csv`"""
+        `POST /v0/wallet/withdrawals/csv`
+
+        `stream` returns before the CSV is downloaded, to be read line by line with `Response.iter_lines()`
+        instead of being held in memory at once. Close the response if it is not read to the end."""
+
+        body = _baseclient.filter_none(start_time=start_secs, end_time=end_secs)
+        return self.bc.post("/v0/wallet/withdrawals/csv", body=_baseclient.dumps(body), stream=stream)
 
-        body = {}
-        if start_secs is not None:
-            body["start_time"] = start_secs
-        if end_secs is not None:
-            body["end_time"] = end_secs
-        return self.bc.post("/v0/wallet/withdrawals/csv", body=json.dumps(body))
+    def iter_withdrawals_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None
+    ) -> Iterator[List[str]]:
+        """Iterate over the rows of the CSV export of withdrawals (header first) as it downloads,
+        without holding the whole export in memory. Takes the same parameters as `get_withdrawals_csv`.
+
+        Raises `requests.HTTPError` if the request fails."""
+
+        return _baseclient.read_csv(self.get_withdrawals_csv, start_secs=start_secs, end_secs=end_secs)
 
     def provision_address(self, coin: str) -> Res:
         """Provisions an address for deposit of an asset
@@ -200,7 +239,7 @@ class Client:
         Request:
         `{"symbol": "AVAX"}`"""
 
-        body = f'{{ "symbol": "{coin}" }}'
+        body = _baseclient.dumps({"symbol": coin})
         return self.bc.post("/v0/provision_address", body=body)
 
     def withdraw(self, to_address: str, amount: Union[str, Decimal], custom_id: str, coin: str) -> Res:
@@ -220,8 +259,176 @@ class Client:
 
         body = {
             "address": to_address,
-            "amount": str(amount),
+            "amount": _baseclient.decimal_str(amount),
             "customer_withdrawal_id": custom_id,
             "symbol": coin,
         }
-        return self.bc.post("/v0/withdraw", body=json.dumps(body))
+        return self.bc.post("/v0/withdraw", body=_baseclient.dumps(body))
+
+
+class AsyncClient:
+    """AsyncClient is the async version of Client.
+    Its methods, common endpoints included, are coroutines, so independent requests can be made concurrently:
+
+    ```
+    client = AsyncClient(api_key, api_secret, models.PROD)
+    balances, markets = await asyncio.gather(client.get_balances(), client.get_markets())
+    prices, fills = await asyncio.gather(client.cross.get_prices(), client.cross.get_fills())
+    await client.aclose()
+    ```
+
+    Requests are made by a Client's BaseClient on a thread pool of `max_workers` threads,
+    sharing its session (connection pool and auth).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        base_url: str = models.PROD,
+        *,
+        max_workers: int = _baseclient.POOL_MAXSIZE,
+    ):
+        self._client = Client(api_key, api_secret, base_url)
+        self.bc = _baseclient.AsyncBaseClient(self._client.bc, max_workers)
+
+        self.cross = _cross.AsyncCross(self.bc)
+        self.perps = _perps.AsyncPerps(self.bc)
+        self.spot = _spot.AsyncSpot(self.bc)
+
+    def close(self) -> None:
+        """Wait for running requests to finish, then release the thread pool and connections.
+        Blocks, so from a coroutine use `aclose`."""
+        self.bc.close()
+
+    async def aclose(self) -> None:
+        """Close the AsyncClient (see `close`) without blocking the event loop while running requests finish.
+        The AsyncClient can also be used as an async context manager to do this."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> AsyncClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    # Common REST API, see `Client` for the documentation of each endpoint.
+
+    async def wait_until_ready(self, sleep_time: float = 1, fail_after: float = 10) -> bool:
+        """Wait for the API to be ready, see `Client.wait_until_ready`.
+        Sleeps without blocking the event loop."""
+        start = time.time()
+        while not (await self.bc.run(self.bc.bc.get, "/status", signed=False, fixed_path=True)).ok:
+            if fail_after > 0 and ((time.time() - start) > fail_after):
+                return False
+            await asyncio.sleep(sleep_time)
+        return True
+
+    async def authed_hello(self) -> Res:
+        """Make a request to the authed hello endpoint.
+
+        `GET /authedHello`"""
+        return await self.bc.run(self._client.authed_hello)
+
+    async def get_address_book(self, *, max_age_secs: float = 0) -> Res:
+        """Make a request to the address book endpoint, see `Client.get_address_book`.
+
+        `GET /v0/address_book`"""
+        return await self.bc.run(self._client.get_address_book, max_age_secs=max_age_secs)
+
+    async def get_markets(self, *, max_age_secs: float = 0) -> Res:
+        """Make a request to the markets endpoint, returns the markets tradeable by the user, see `Client.get_markets`.
+
+        `GET /v1/markets`"""
+        return await self.bc.run(self._client.get_markets, max_age_secs=max_age_secs)
+
+    async def get_balance(self, coin: str) -> Res:
+        """Gets balance of a specific asset, see `Client.get_balance`.
+
+        `POST /v0/get_balance`"""
+        return await self.bc.run(self._client.get_balance, coin)
+
+    async def get_balances(self) -> Res:
+        """Gets balances of all assets in wallet
+
+        `GET /v0/wallet/balances`"""
+        return await self.bc.run(self._client.get_balances)
+
+    async def get_deposit_addresses(self, coins: List[str]) -> Res:
+        """Gets all provisioned addresses for the coins for an account, see `Client.get_deposit_addresses`.
+
+        `POST /v0/wallet/deposit_address/list`"""
+        return await self.bc.run(self._client.get_deposit_addresses, coins)
+
+    async def get_deposits(self) -> Res:
+        """Gets all deposits for an account, see `Client.get_deposits`.
+
+        `GET /v0/wallet/deposits`"""
+        return await self.bc.run(self._client.get_deposits)
+
+    async def get_deposit(self, txid: str) -> Res:
+        """Gets a deposit by transaction ID.
+
+        `GET /v0/wallet/deposits/<TxID>`"""
+        return await self.bc.run(self._client.get_deposit, txid)
+
+    async def get_deposits_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None, stream: bool = False
+    ) -> Res:
+        """Gets deposits for an account within the start and end times (optional)
+
+        `POST /v0/wallet/deposits/csv`"""
+        return await self.bc.run(self._client.get_deposits_csv, start_secs=start_secs, end_secs=end_secs, stream=stream)
+
+    def iter_deposits_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None
+    ) -> AsyncIterator[List[str]]:
+        """Async iterate over the rows of the CSV export of deposits as it downloads, see `Client.iter_deposits_csv`."""
+        return _baseclient.aread_csv(self.bc, self.get_deposits_csv, start_secs=start_secs, end_secs=end_secs)
+
+    async def get_withdrawals(self) -> Res:
+        """Gets all withdrawals for an account.
+
+        `GET /v0/wallet/withdrawals`"""
+        return await self.bc.run(self._client.get_withdrawals)
+
+    async def get_withdrawal(self, *, custom_id: Optional[str] = None, internal_id: Optional[str] = None) -> Res:
+        """Get withdrawal status, see `Client.get_withdrawal`.
+
+        `POST /v0/get_withdrawal_status`"""
+        return await self.bc.run(self._client.get_withdrawal, custom_id=custom_id, internal_id=internal_id)
+
+    async def get_withdrawal_by_txid(self, txid: str) -> Res:
+        """Gets a withdrawal by transaction ID.
+
+        `GET /v0/wallet/withdrawals/<TxID>`"""
+        return await self.bc.run(self._client.get_withdrawal_by_txid, txid)
+
+    async def get_withdrawals_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None, stream: bool = False
+    ) -> Res:
+        """Gets withdrawals for an account within the start and end times (optional)
+
+        `POST /v0/wallet/withdrawals/csv`"""
+        return await self.bc.run(
+            self._client.get_withdrawals_csv, start_secs=start_secs, end_secs=end_secs, stream=stream
+        )
+
+    def iter_withdrawals_csv(
+        self, *, start_secs: Optional[int] = None, end_secs: Optional[int] = None
+    ) -> AsyncIterator[List[str]]:
+        """Async iterate over the rows of the CSV export of withdrawals as it downloads, see
+        `Client.iter_withdrawals_csv`."""
+        return _baseclient.aread_csv(self.bc, self.get_withdrawals_csv, start_secs=start_secs, end_secs=end_secs)
+
+    async def provision_address(self, coin: str) -> Res:
+        """Provisions an address for deposit of an asset, see `Client.provision_address`.
+
+        `POST /v0/provision_address`"""
+        return await self.bc.run(self._client.provision_address, coin)
+
+    async def withdraw(self, to_address: str, amount: Union[str, Decimal], custom_id: str, coin: str) -> Res:
+        """Initiates a withdrawal, see `Client.withdraw`.
+
+        `POST /v0/withdraw`"""
+        return await self.bc.run(self._client.withdraw, to_address, amount, custom_id, coin)
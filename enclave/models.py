@@ -1,6 +1,6 @@
 """Provides constants for types"""
 
-from typing import Final, Set
+from typing import FrozenSet, Final
 
 import requests
 
@@ -8,7 +8,7 @@ GET: Final[str] = "GET"
 POST: Final[str] = "POST"
 DELETE: Final[str] = "DELETE"
 PUT: Final[str] = "PUT"
-VERBS: Final[Set[str]] = {GET, POST, DELETE, PUT}
+VERBS: Final[FrozenSet[str]] = frozenset({GET, POST, DELETE, PUT})
 
 DEV: Final[str] = "https://api-dev.enclavemarket.dev"
 PROD: Final[str] = "https://api.enclave.market"
@@ -16,23 +16,23 @@ SANDBOX: Final[str] = "https://api-sandbox.enclave.market"
 
 BUY: Final[str] = "buy"
 SELL: Final[str] = "sell"
-SIDES: Final[Set[str]] = {BUY, SELL}
+SIDES: Final[FrozenSet[str]] = frozenset({BUY, SELL})
 
 GTC: Final[str] = "GTC"
 IOC: Final[str] = "IOC"
-TIME_IN_FORCE: Final[Set[str]] = {GTC, IOC}
+TIME_IN_FORCE: Final[FrozenSet[str]] = frozenset({GTC, IOC})
 
 LIMIT: Final[str] = "limit"
 MARKET: Final[str] = "market"
-ORDER_TYPES: Final[Set[str]] = {LIMIT, MARKET}
+ORDER_TYPES: Final[FrozenSet[str]] = frozenset({LIMIT, MARKET})
 
 LONG: Final[str] = "long"
 SHORT: Final[str] = "short"
-DIRECTIONS: Final[Set[str]] = {LONG, SHORT}
+DIRECTIONS: Final[FrozenSet[str]] = frozenset({LONG, SHORT})
 
 STOP_LOSS: Final[str] = "stopLoss"
 TAKE_PROFIT: Final[str] = "takeProfit"
-STOP_TYPES: Final[Set[str]] = {STOP_LOSS, TAKE_PROFIT}
+STOP_TYPES: Final[FrozenSet[str]] = frozenset({STOP_LOSS, TAKE_PROFIT})
 
 
 Res = requests.Response
@@ -3,8 +3,6 @@
 import asyncio
 import decimal
 import functools
-import hashlib
-import hmac
 import json
 import logging
 import time
@@ -14,7 +12,10 @@ from typing import Any, Callable, Dict, Final, Optional, TypeVar
 import websockets
 import websockets.legacy.client
 
+from . import _baseclient
+
 LOGIN_STR: Final[str] = "enclave_ws_login"
+_LOGIN_BYTES: Final[bytes] = LOGIN_STR.encode()
 
 SUBSCRIBE: Final[str] = '{{"op":"subscribe", "channel":"{channel}"}}'
 UNSUBSCRIBE: Final[str] = '{{"op":"unsubscribe", "channel":"{channel}"}}'
@@ -79,7 +80,7 @@ class WebSocketClient:
         on_exit: Callable[[], None] = noop,
     ):
         self._base_url = base_url
-        self._key, self.__secret = api_key, api_secret
+        self._key, self.__signer = api_key, _baseclient.Signer(api_secret)
         self._client: Optional[websockets.WebSocketClientProtocol] = None
         self._pending_subscriptions: Dict[str, Callback] = {}
         self._callbacks: Dict[str, Callback] = defaultdict(lambda: noop)
@@ -110,9 +111,8 @@ class WebSocketClient:
 
         https://enclave-markets.notion.site/Common-WebSocket-API-c30db312d36b4bd3a4c77c569db25c4e#9dc9468b99c54c76b92ad191b4ac3d21.
         """
-        unix_ms = str(int(time.time() * 1_000))
-        message: str = f"{unix_ms}{LOGIN_STR}"
-        auth = hmac.new(self.__secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+        unix_ms = str(time.time_ns() // 1_000_000)
+        auth = self.__signer.sign(unix_ms.encode(), _LOGIN_BYTES)
 
         return json.dumps({"op": "login", "args": {"key": self._key, "time": unix_ms, "sign": auth}})
 
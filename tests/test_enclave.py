@@ -1,6 +1,469 @@
 """Pytest tests"""
 
+import asyncio
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import threading
+import urllib.parse
+from concurrent.futures import Future
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+import requests.adapters
+import urllib3
+
+from enclave import _baseclient, _perps, _spot, client, models, wsclient
+
+
+class FakeResponse(requests.Response):
+    """A Response recording whether it was closed."""
+
+    closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+class FakeAdapter(requests.adapters.BaseAdapter):
+    """Answers requests in memory with `respond(request) -> (status, headers, body)`,
+    recording the requests sent and the responses returned."""
+
+    def __init__(self, respond):
+        super().__init__()
+        self.respond = respond
+        self.sent: list = []
+        self.responses: list = []
+        self.settings: list = []
+        self.closed = False
+
+    def send(self, request, stream=False, **kwargs):
+        status, headers, body = self.respond(request)
+        self.sent.append(request)
+        self.settings.append(kwargs)
+        res = FakeResponse()
+        res.request, res.url, res.status_code = request, request.url, status
+        res.headers.update(headers)
+        res.encoding = requests.utils.get_encoding_from_headers(res.headers)
+        res.raw = urllib3.HTTPResponse(io.BytesIO(body), headers=headers, status=status, preload_content=False)
+        self.responses.append(res)
+        return res
+
+    def close(self):
+        self.closed = True
+
+
+def fake_base_client(respond):
+    """A BaseClient whose requests are answered by a FakeAdapter with `respond`."""
+    bc = _baseclient.BaseClient("key", "secret", "https://api.enclave.market")
+    adapter = FakeAdapter(respond)
+    bc.s.mount("https://", adapter)
+    return bc, adapter
+
+
+def paged_fills(pages):
+    """A FakeAdapter `respond` serving `pages` ({cursor: (fills, next cursor)}) for the cursor in the query,
+    or a 500 for an unknown cursor."""
+
+    def respond(req):
+        cursor = urllib.parse.parse_qs(urllib.parse.urlsplit(req.url).query).get("cursor", [None])[0]
+        if cursor not in pages:
+            return 500, {}, b'{"error": "internal"}'
+        fills, next_cursor = pages[cursor]
+        return (
+            200,
+            {"Content-Type": "application/json"},
+            json.dumps({"result": fills, "pageInfo": {"nextCursor": next_cursor}}).encode(),
+        )
+
+    return respond
+
 
 def test_test():
     """Test the tests."""
     assert bool(1)
+
+
+def test_api_auth_signature():
+    """ApiAuth signs `timestamp + method + path + body` with HMAC-SHA256 of the secret."""
+    for secret in ("secret", "s" * 100):
+        req = requests.Request(
+            "POST", "https://api.enclave.market/v1/orders?market=AVAX-USDC", data='{"side": "buy"}'
+        ).prepare()
+        _baseclient.ApiAuth("key", secret)(req)
+
+        message = f"{req.headers['ENCLAVE-TIMESTAMP']}POST/v1/orders?market=AVAX-USDC" + '{"side": "buy"}'
+        expected = hmac.new(secret.encode(), message.encode(), hashlib.sha256).hexdigest()
+        assert req.headers["ENCLAVE-KEY-ID"] == "key"
+        assert req.headers["ENCLAVE-SIGN"] == expected
+
+
+def test_ws_login_signature():
+    """The websocket login signs `time + enclave_ws_login` with HMAC-SHA256 of the secret."""
+    login = json.loads(wsclient.WebSocketClient("key", "secret", "wss://localhost")._auth_message())
+
+    message = f"{login['args']['time']}enclave_ws_login"
+    assert login["args"]["sign"] == hmac.new(b"secret", message.encode(), hashlib.sha256).hexdigest()
+
+
+def test_conditional_get_reuses_not_modified_response():
+    """Conditional GETs send `If-None-Match` with the last `ETag` and return the cached response on 304."""
+    bc, adapter = fake_base_client(
+        lambda req: (
+            (304, {"ETag": '"v1"'}, b"")
+            if "If-None-Match" in req.headers
+            else (200, {"ETag": '"v1"'}, b'{"result": 1}')
+        )
+    )
+
+    first = bc.get("/v1/depth", params={"market": "AVAX-USDC"}, conditional=True)
+    second = bc.get("/v1/depth", params={"market": "AVAX-USDC"}, conditional=True)
+
+    assert "If-None-Match" not in adapter.sent[0].headers
+    assert adapter.sent[1].headers["If-None-Match"] == '"v1"'
+    assert second is first and second.json() == {"result": 1}
+
+
+def test_static_requests_are_signed_per_call():
+    """Requests prepared from a cached template are signed individually and leave the template unsigned."""
+    bc = _baseclient.BaseClient("key", "secret", "https://api.enclave.market")
+
+    first = bc._prepare_static("GET", "https://api.enclave.market/v1/markets", True)
+    first.headers["ENCLAVE-TIMESTAMP"] = "0"
+    second = bc._prepare_static("GET", "https://api.enclave.market/v1/markets", True)
+    unsigned = bc._prepare_static("GET", "https://api.enclave.market/v1/markets", False)
+
+    message = f"{second.headers['ENCLAVE-TIMESTAMP']}GET/v1/markets"
+    assert second.headers["ENCLAVE-SIGN"] == hmac.new(b"secret", message.encode(), hashlib.sha256).hexdigest()
+    assert second.headers["ENCLAVE-TIMESTAMP"] != "0"
+    assert "ENCLAVE-SIGN" not in unsigned.headers
+
+
+def test_static_requests_follow_session_changes():
+    """Session headers and auth changed after a body-less request still apply to the next ones."""
+    bc, adapter = fake_base_client(lambda req: (200, {}, b"{}"))
+
+    bc.get("/v1/markets", fixed_path=True)
+    bc.s.headers["X-Trace"] = "abc"
+    bc.get("/v1/markets", fixed_path=True)
+    bc.s.auth = _baseclient.ApiAuth("other", "secret")
+    bc.get("/v1/markets", fixed_path=True)
+
+    assert "X-Trace" not in adapter.sent[0].headers
+    assert adapter.sent[1].headers["X-Trace"] == "abc"
+    assert adapter.sent[1].headers["ENCLAVE-KEY-ID"] == "key"
+    assert adapter.sent[2].headers["ENCLAVE-KEY-ID"] == "other"
+
+
+def test_only_fixed_paths_are_templated():
+    """Requests to per-id paths are prepared normally, so they don't evict the templates of fixed paths."""
+    bc, adapter = fake_base_client(lambda req: (200, {}, b"{}"))
+
+    bc.get("/v1/markets", fixed_path=True)
+    for i in range(_baseclient.PREPARED_CACHE_SIZE + 1):
+        bc.get(f"/v1/orders/{i}")
+
+    assert [key[1] for key in bc._prepared] == ["https://api.enclave.market/v1/markets"]
+    assert adapter.sent[-1].url == f"https://api.enclave.market/v1/orders/{_baseclient.PREPARED_CACHE_SIZE}"
+
+
+def test_iter_csv_parses_streamed_export():
+    """CSV exports are decompressed, decoded and parsed while streamed, and the response is closed afterwards."""
+    csv_body = 'id,note\r\n1,"line one\nline two"\r\n2,café\r\n'.encode()
+    bc, adapter = fake_base_client(
+        lambda req: (200, {"Content-Type": "text/csv", "Content-Encoding": "gzip"}, gzip.compress(csv_body))
+    )
+
+    rows = list(_spot.Spot(bc).iter_fills_csv(market="AVAX-USDC"))
+
+    assert rows == [["id", "note"], ["1", "line one\nline two"], ["2", "café"]]
+    assert adapter.sent[0].url == "https://api.enclave.market/v1/fills/csv?market=AVAX-USDC"
+    assert adapter.responses[0].closed
+
+
+def test_retry_policy_resends_overloaded_gets_only():
+    """GETs answered with 503 are retried up to MAX_RETRIES times and the last response returned, POSTs are not."""
+    methods = []
+
+    class Overloaded(BaseHTTPRequestHandler):
+        def reply(self):
+            methods.append(self.command)
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        do_GET = do_POST = reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Overloaded)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        bc = _baseclient.BaseClient("key", "secret", f"http://127.0.0.1:{server.server_port}")
+
+        assert bc.get("/v1/markets").status_code == 503
+        assert methods == ["GET"] * (1 + _baseclient.MAX_RETRIES)
+
+        methods.clear()
+        assert bc.post("/v1/orders", body=b"{}").status_code == 503
+        assert methods == ["POST"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retry_after_is_capped():
+    """A long `Retry-After` is waited for at most MAX_RETRY_AFTER_SECS."""
+    res = urllib3.HTTPResponse(headers={"Retry-After": "120"}, status=429)
+    assert _baseclient._Retry().get_retry_after(res) == _baseclient.MAX_RETRY_AFTER_SECS
+
+
+def test_paginate_follows_cursor():
+    """The iterators yield every item across pages, following `nextCursor` until it is empty."""
+    bc, adapter = fake_base_client(paged_fills({None: ([1, 2], "c1"), "c1": ([3], "c2"), "c2": ([4], "")}))
+
+    assert list(_spot.Spot(bc).iter_fills(limit=2)) == [1, 2, 3, 4]
+    assert [req.url.rpartition("?")[2] for req in adapter.sent] == ["limit=2", "limit=2&cursor=c1", "limit=2&cursor=c2"]
+
+
+class PendingExecutor:
+    """Leaves submitted calls queued, as when all prefetch threads are busy."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.futures.append(Future())
+        return self.futures[-1]
+
+
+def test_paginate_cancels_prefetch_when_closed_early():
+    """Closing an iterator early cancels the queued request for the next page."""
+    bc, adapter = fake_base_client(paged_fills({None: ([1, 2], "c1"), "c1": ([3], "")}))
+    bc._prefetcher = executor = PendingExecutor()
+
+    fills = _spot.Spot(bc).iter_fills()
+    assert next(fills) == 1
+    fills.close()
+
+    assert executor.futures[0].cancelled()
+    assert len(adapter.sent) == 1
+
+
+def test_paginate_fetches_queued_page_inline():
+    """A next page still queued when needed is fetched on the caller's thread instead of waited for."""
+    bc, adapter = fake_base_client(paged_fills({None: ([1], "c1"), "c1": ([2], "")}))
+    bc._prefetcher = executor = PendingExecutor()
+
+    assert list(_spot.Spot(bc).iter_fills()) == [1, 2]
+    assert executor.futures[0].cancelled()
+    assert len(adapter.sent) == 2
+
+
+def test_clients_prefetch_on_their_own_threads():
+    """Each client prefetches pages on its own pool, so one client's slow pages don't queue another's."""
+    pages = {None: ([1], "c1"), "c1": ([2], "")}
+    first, _ = fake_base_client(paged_fills(pages))
+    second, _ = fake_base_client(paged_fills(pages))
+
+    assert list(_spot.Spot(first).iter_fills()) == list(_spot.Spot(second).iter_fills()) == [1, 2]
+    assert first._prefetcher is not None and second._prefetcher is not None
+    assert first._prefetcher is not second._prefetcher
+
+
+def test_paginate_raises_on_failed_page():
+    """A failed page raises HTTPError instead of being yielded, after the items of the pages before it."""
+    bc, _ = fake_base_client(paged_fills({None: ([1, 2], "gone")}))
+
+    fills = _spot.Spot(bc).iter_fills()
+    assert [next(fills), next(fills)] == [1, 2]
+    with pytest.raises(requests.HTTPError):
+        next(fills)
+
+
+def test_order_mutations_invalidate_cached_orders():
+    """Orders listed with `max_age_secs` are reused until orders are cancelled through the client."""
+    bc, adapter = fake_base_client(lambda req: (200, {}, b'{"result": []}'))
+    spot = _spot.Spot(bc)
+
+    first = spot.get_orders(max_age_secs=10)
+    assert spot.get_orders(max_age_secs=10) is first
+    spot.cancel_orders()
+    assert spot.get_orders(max_age_secs=10) is not first
+
+    assert [req.method for req in adapter.sent] == ["GET", "DELETE", "GET"]
+
+
+def test_failed_order_mutations_invalidate_cached_orders():
+    """Cached orders are dropped even when the order request raises, as it may have reached the exchange."""
+
+    def respond(req):
+        if req.method == "POST":
+            raise requests.exceptions.ReadTimeout()
+        return 200, {}, b'{"result": []}'
+
+    bc, adapter = fake_base_client(respond)
+    perps = _perps.Perps(bc)
+
+    first = perps.get_orders(max_age_secs=10)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        perps.add_order("AVAX-USD.P", models.BUY, Decimal("10"), Decimal("1"), order_type=models.LIMIT)
+    assert perps.get_orders(max_age_secs=10) is not first
+
+
+def test_cache_cleared_in_flight_is_not_repopulated():
+    """A response requested before the cache was cleared is returned but not kept."""
+    bc = None
+
+    def respond(req):
+        bc.clear_cache("/v1/orders")  # e.g. an order cancelled on another thread while this GET is in flight
+        return 200, {}, b'{"result": []}'
+
+    bc, adapter = fake_base_client(respond)
+    spot = _spot.Spot(bc)
+
+    spot.get_orders(max_age_secs=10)
+    spot.get_orders(max_age_secs=10)
+
+    assert len(adapter.sent) == 2
+
+
+def test_get_depth_multi_maps_markets_to_books(monkeypatch):
+    """get_depth_multi returns each market's order book, also from a submitted call with no idle worker."""
+    monkeypatch.setattr(_baseclient, "SUBMIT_WORKERS", 1)
+    bc, _ = fake_base_client(lambda req: (200, {}, json.dumps({"result": req.url.rpartition("=")[2]}).encode()))
+    perps = _perps.Perps(bc)
+
+    books = bc.submit(perps.get_depth_multi, ["BTC-USD.P", "ETH-USD.P", "AVAX-USD.P"]).result(timeout=5)
+
+    assert {market: book.json()["result"] for market, book in books.items()} == {
+        "BTC-USD.P": "BTC-USD.P",
+        "ETH-USD.P": "ETH-USD.P",
+        "AVAX-USD.P": "AVAX-USD.P",
+    }
+
+
+def test_submit_order_resolves_to_signed_response():
+    """A submitted order resolves to its signed response, and close() waits for it and rejects later submits."""
+    started, release, released = threading.Event(), threading.Event(), []
+
+    def respond(req):
+        started.set()
+        released.append(release.wait(timeout=5))  # held in flight until close() is waiting for it
+        return 200, {}, b'{"result": {"status": "open"}}'
+
+    bc, _ = fake_base_client(respond)
+    future = _spot.Spot(bc).submit_order("AVAX-USDC", models.BUY, "12.5", "2", order_type=models.LIMIT)
+    assert started.wait(timeout=5) and not future.done()
+
+    shutdown = bc._submitter.shutdown
+
+    def release_on_shutdown(*args, **kwargs):
+        release.set()
+        shutdown(*args, **kwargs)
+
+    bc._submitter.shutdown = release_on_shutdown
+    bc.close()
+
+    assert released == [True] and future.done()
+    res = future.result()
+    message = f"{res.request.headers['ENCLAVE-TIMESTAMP']}POST/v1/orders" + res.request.body.decode()
+    assert res.request.headers["ENCLAVE-SIGN"] == hmac.new(b"secret", message.encode(), hashlib.sha256).hexdigest()
+    assert json.loads(res.request.body) == {
+        "market": "AVAX-USDC",
+        "side": "buy",
+        "price": "12.5",
+        "size": "2",
+        "type": "limit",
+    }
+    with pytest.raises(RuntimeError):
+        bc.submit(bc.get, "/v1/markets")
+
+
+def test_zero_decimals_are_sent():
+    """A zero price or amount is sent as "0" rather than dropped as falsy."""
+    bc, adapter = fake_base_client(lambda req: (200, {}, b"{}"))
+
+    _spot.Spot(bc).add_order("AVAX-USDC", models.BUY, Decimal(0), Decimal("1.5"))
+    _perps.Perps(bc).add_order("BTC-USD.P", models.SELL, price=Decimal("0.00"), size="1")
+
+    assert b'"price":"0",' in adapter.sent[0].body
+    assert b'"price":"0.00"' in adapter.sent[1].body
+
+
+def test_transfer_direction_follows_amount_sign():
+    """Negative transfer amounts withdraw their absolute value from margin to main, positive ones deposit."""
+    bc, adapter = fake_base_client(lambda req: (200, {}, b"{}"))
+    perps = _perps.Perps(bc)
+
+    perps.transfer("USDC", "-1.50")
+    perps.transfer("USDC", Decimal("2"))
+
+    withdrawal, deposit = (json.loads(req.body) for req in adapter.sent)
+    assert withdrawal == {"symbol": "USDC", "amount": "1.50", "from": {"wallet": "margin"}, "to": {"wallet": "main"}}
+    assert deposit == {"symbol": "USDC", "amount": "2", "from": {"wallet": "main"}, "to": {"wallet": "margin"}}
+
+
+def test_async_client():
+    """AsyncClient makes signed calls concurrently, paginates, and closes without blocking the event loop."""
+    pages = paged_fills({None: ([1, 2], "c1"), "c1": ([3], "")})
+    started, release, finished, released = threading.Event(), threading.Event(), threading.Event(), []
+
+    def respond(req):
+        path = urllib.parse.urlsplit(req.url).path
+        if path == "/v1/fills":
+            return pages(req)
+        if path == "/v0/wallet/deposits":
+            started.set()
+            released.append(release.wait(timeout=5))  # held in flight until the client is closing
+            finished.set()
+        return 200, {}, json.dumps({"result": path}).encode()
+
+    adapter = FakeAdapter(respond)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        async with client.AsyncClient("key", "secret", "https://api.enclave.market") as aclient:
+            aclient.bc.bc.s.mount("https://", adapter)
+            hello = await aclient.authed_hello()
+            balances, markets = await asyncio.gather(aclient.get_balances(), aclient.get_markets())
+            fills = [fill async for fill in aclient.spot.iter_fills()]
+            deposits = asyncio.ensure_future(aclient.get_deposits())
+            assert await loop.run_in_executor(None, started.wait, 5)
+            loop.call_soon(release.set)  # only runs if closing leaves the event loop running
+        assert finished.is_set()  # closing waited for the deposits request
+        return aclient, hello, balances, markets, fills, await deposits
+
+    aclient, hello, balances, markets, fills, deposits = asyncio.run(main())
+
+    message = f"{hello.request.headers['ENCLAVE-TIMESTAMP']}GET/authedHello"
+    assert hello.request.headers["ENCLAVE-SIGN"] == hmac.new(b"secret", message.encode(), hashlib.sha256).hexdigest()
+    assert (balances.json(), markets.json()) == ({"result": "/v0/wallet/balances"}, {"result": "/v1/markets"})
+    assert fills == [1, 2, 3]
+    assert deposits.json() == {"result": "/v0/wallet/deposits"}
+    assert released == [True]  # the event loop kept running while closing waited for the deposits request
+    assert adapter.closed
+    with pytest.raises(RuntimeError):
+        asyncio.run(aclient.get_markets())
+
+
+def test_requests_use_environment_ca_bundle(monkeypatch):
+    """Requests are verified with REQUESTS_CA_BUNDLE, as with Session.request, and use environment proxies."""
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", "/etc/ssl/corporate.pem")
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.internal:3128")
+    bc, adapter = fake_base_client(lambda req: (200, {"ETag": '"v1"'}, b"{}"))
+
+    bc.get("/v1/markets")
+    bc.get("/v1/depth", params={"market": "AVAX-USDC"}, conditional=True)
+
+    for settings in adapter.settings:
+        assert settings["verify"] == "/etc/ssl/corporate.pem"
+        assert settings["proxies"]["https"] == "http://proxy.internal:3128"